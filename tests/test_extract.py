@@ -1,5 +1,8 @@
+import threading
+import pytest
 import requests
 from utils.extract import extract_product_data, scrape_page, scrape_all_pages
+from utils.extract import Source, FASHION_STUDIO, HostLimiter, fetch_page, get_sources, scrape_sources
 from unittest.mock import patch, Mock
 
 def test_extract_complete():
@@ -150,3 +153,152 @@ def test_scrape_page_parsing_exception_path():
     mock_session.get.return_value = BadResponse()
     with patch("utils.extract.extract_product_data", side_effect=Exception("parse boom")):
         assert scrape_page(mock_session, 1) == []
+
+CARD_HTML = """
+<html><body><ul>
+  <li class="item"><b>{title}</b><i>$5</i></li>
+</ul></body></html>
+"""
+
+class ListSource(Source):
+    def __init__(self, name, base_url):
+        self.name = name
+        self.base_url = base_url
+
+    def page_url(self, page_num):
+        return f"{self.base_url}?p={page_num}"
+
+    def find_cards(self, soup):
+        return soup.find_all("li", class_="item")
+
+    def parse_card(self, card, timestamp):
+        return {"Title": card.b.get_text(strip=True), "Price": card.i.get_text(strip=True), "Timestamp": timestamp}
+
+class PageResponse:
+    def __init__(self, url):
+        self.url = url
+    def raise_for_status(self): ...
+    @property
+    def content(self):
+        return CARD_HTML.format(title=self.url).encode()
+
+def test_fashion_studio_page_urls():
+    assert FASHION_STUDIO.host == "fashion-studio.dicoding.dev"
+    assert FASHION_STUDIO.page_urls(1, 3) == [
+        "https://fashion-studio.dicoding.dev/",
+        "https://fashion-studio.dicoding.dev/page2",
+        "https://fashion-studio.dicoding.dev/page3",
+    ]
+
+def test_get_sources_unknown():
+    assert get_sources(["fashion-studio"]) == [FASHION_STUDIO]
+    with pytest.raises(ValueError):
+        get_sources(["missing"])
+
+def test_host_limiter_spacing():
+    with patch("utils.extract.time.monotonic", return_value=100.0), patch("utils.extract.time.sleep") as mock_sleep:
+        limiter = HostLimiter(0.5)
+        limiter.wait()
+        limiter.wait()
+        limiter.wait()
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 1.0]
+
+@patch("utils.extract.requests.Session")
+def test_scrape_sources_order_and_plugins(mock_sess):
+    mock_sess.return_value.get.side_effect = lambda url, timeout: PageResponse(url)
+    a = ListSource("a", "https://a.example/")
+    b = ListSource("b", "https://b.example/")
+    data = scrape_sources([a, b], 1, 3, concurrency=2, min_interval=0)
+    assert [d["Title"] for d in data] == [
+        "https://a.example/?p=1", "https://a.example/?p=2", "https://a.example/?p=3",
+        "https://b.example/?p=1", "https://b.example/?p=2", "https://b.example/?p=3",
+    ]
+
+@patch("utils.extract.requests.Session")
+def test_scrape_sources_hosts_run_in_parallel(mock_sess):
+    # One worker per host; each first request waits until the other host's
+    # first request has started, which only happens if hosts run concurrently.
+    barrier = threading.Barrier(2, timeout=5)
+    def get(url, timeout):
+        if url.endswith("p=1"):
+            barrier.wait()
+        return PageResponse(url)
+    mock_sess.return_value.get.side_effect = get
+    sources = [ListSource("a", "https://a.example/"), ListSource("b", "https://b.example/")]
+    data = scrape_sources(sources, 1, 2, concurrency=1, min_interval=0)
+    assert len(data) == 4
+    assert not barrier.broken
+
+def test_scrape_sources_empty():
+    assert scrape_sources([], 1, 3) == []
+
+def test_source_requires_all_hooks():
+    class Incomplete(Source):
+        name = "incomplete"
+        base_url = "https://x.example/"
+        def page_url(self, page_num):
+            return self.base_url
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_host_limiter_waits_after_completion():
+    with patch("utils.extract.time.monotonic") as mock_now, patch("utils.extract.time.sleep") as mock_sleep:
+        limiter = HostLimiter(0.3)
+        mock_now.return_value = 100.0
+        limiter.wait()
+        mock_now.return_value = 102.0
+        limiter.done()
+        limiter.wait()
+    mock_sleep.assert_called_once_with(pytest.approx(0.3))
+
+@patch("utils.extract.requests.Session")
+def test_scrape_sources_tags_records_with_source(mock_sess):
+    mock_sess.return_value.get.side_effect = lambda url, timeout: PageResponse("T-shirt 2")
+    a = ListSource("a", "https://a.example/")
+    b = ListSource("b", "https://b.example/")
+    data = scrape_sources([a, b], 1, 1, min_interval=0)
+    assert [(d["Source"], d["Title"]) for d in data] == [("a", "T-shirt 2"), ("b", "T-shirt 2")]
+
+@patch("utils.extract.requests.Session")
+def test_scrape_sources_skips_broken_source(mock_sess):
+    mock_sess.return_value.get.side_effect = lambda url, timeout: PageResponse(url)
+    class Broken(ListSource):
+        def page_urls(self, start, end):
+            raise RuntimeError("bad plugin")
+    data = scrape_sources([Broken("x", "https://x.example/"), ListSource("a", "https://a.example/")], 1, 2, min_interval=0)
+    assert [d["Title"] for d in data] == ["https://a.example/?p=1", "https://a.example/?p=2"]
+
+@patch("utils.extract.requests.Session")
+def test_scrape_sources_skips_failing_page(mock_sess):
+    mock_sess.return_value.get.side_effect = lambda url, timeout: PageResponse(url)
+    def fetch(session, url, source):
+        if url.endswith("p=1"):
+            raise RuntimeError("worker boom")
+        return fetch_page(session, url, source)
+    with patch("utils.extract.fetch_page", side_effect=fetch):
+        data = scrape_sources([ListSource("a", "https://a.example/")], 1, 3, min_interval=0)
+    assert [d["Title"] for d in data] == ["https://a.example/?p=2", "https://a.example/?p=3"]
+
+@patch("utils.extract.requests.Session")
+def test_scrape_sources_logs_http_failure(mock_sess, caplog):
+    def get(url, timeout):
+        if url.endswith("p=1"):
+            raise requests.ConnectionError("refused")
+        return PageResponse(url)
+    mock_sess.return_value.get.side_effect = get
+    with caplog.at_level("WARNING", logger="utils.extract"):
+        data = scrape_sources([ListSource("a", "https://a.example/")], 1, 2, min_interval=0)
+    assert [d["Title"] for d in data] == ["https://a.example/?p=2"]
+    assert "https://a.example/?p=1" in caplog.text
+    assert "'a'" in caplog.text and "refused" in caplog.text
+
+def test_fetch_page_logs_parse_failure(caplog):
+    class BadCards(ListSource):
+        def find_cards(self, soup):
+            raise ValueError("markup changed")
+    session = Mock()
+    session.get.return_value = PageResponse("x")
+    with caplog.at_level("WARNING", logger="utils.extract"):
+        assert fetch_page(session, "https://b.example/?p=1", BadCards("b", "https://b.example/")) == []
+    assert "https://b.example/?p=1" in caplog.text
+    assert "markup changed" in caplog.text
@@ -1,8 +1,9 @@
 import os
+import time
 import pytest
 import pandas as pd
 from unittest.mock import patch, MagicMock
-from utils.load import save_csv, save_google_sheets, make_pg_engine, ensure_products_table, save_postgres
+from utils.load import save_csv, save_google_sheets, make_pg_engine, ensure_products_table, ensure_month_partitions, save_postgres
 
 @pytest.fixture
 def df_ok():
@@ -146,7 +147,7 @@ def test_save_postgres_insert_ok(mock_text, mock_engine_mk, mock_ensure, df_pg_o
     mock_engine_mk.return_value = engine
     assert save_postgres(df_pg_ok) == len(df_pg_ok)
     mock_engine_mk.assert_called_once()
-    mock_ensure.assert_called_once_with(engine)
+    mock_ensure.assert_called_once_with(engine, schema="flat")
     engine.begin.assert_called_once()
     assert conn.execute.call_count == 1
 
@@ -216,3 +217,136 @@ def test_save_postgres_dropna_all(mock_engine_mk, mock_ensure):
     })
     mock_engine_mk.return_value = MagicMock()
     assert save_postgres(df) == 0
+
+@patch("utils.load.text")
+def test_ensure_products_table_normalized(mock_text):
+    engine = MagicMock()
+    ctx = MagicMock()
+    conn = MagicMock()
+    ctx.__enter__.return_value = conn
+    engine.begin.return_value = ctx
+    ensure_products_table(engine, schema="normalized")
+    ddl = " ".join(str(c.args[0]) for c in mock_text.call_args_list)
+    assert "PARTITION BY RANGE (ts)" in ddl
+    assert "PRIMARY KEY (product_id, ts)" in ddl
+    assert "UNIQUE (source, title)" in ddl
+    assert "latest_product(source, title)" in ddl
+    assert "CREATE INDEX IF NOT EXISTS ix_price_observation" not in ddl
+    assert "CROSS JOIN LATERAL" in ddl
+
+def test_ensure_products_table_unknown_schema():
+    with pytest.raises(ValueError):
+        ensure_products_table(MagicMock(), schema="star")
+
+@patch("utils.load.text")
+def test_ensure_month_partitions(mock_text):
+    conn = MagicMock()
+    ts = pd.to_datetime(["2025-01-03", "2025-01-20", "2025-12-31", None])
+    assert ensure_month_partitions(conn, ts) == 2
+    stmts = [c.args[0] for c in mock_text.call_args_list]
+    assert "price_observation_y2025m01" in stmts[0]
+    assert "FROM ('2025-01-01 00:00:00+00') TO ('2025-02-01 00:00:00+00')" in stmts[0]
+    assert "FROM ('2025-12-01 00:00:00+00') TO ('2026-01-01 00:00:00+00')" in stmts[1]
+
+@patch("utils.load.text")
+def test_ensure_month_partitions_naive_local_time(mock_text, monkeypatch):
+    # Naive timestamps are local time: 03:00 WIB on 1 Feb is still January in UTC.
+    monkeypatch.setenv("TZ", "Asia/Jakarta")
+    time.tzset()
+    try:
+        conn = MagicMock()
+        assert ensure_month_partitions(conn, pd.to_datetime(["2025-02-01T03:00:00"])) == 1
+        assert "price_observation_y2025m01" in mock_text.call_args.args[0]
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+@patch("utils.load.text")
+def test_ensure_month_partitions_tz_aware_uses_utc_month(mock_text):
+    conn = MagicMock()
+    ts = pd.to_datetime(["2025-02-01T03:00:00+07:00"])
+    assert ensure_month_partitions(conn, ts) == 1
+    assert "price_observation_y2025m01" in mock_text.call_args.args[0]
+
+@patch("utils.load.refresh_latest_product")
+@patch("utils.load.ensure_products_table")
+@patch("utils.load.make_pg_engine")
+@patch("utils.load.text")
+def test_save_postgres_normalized(mock_text, mock_engine_mk, mock_ensure, mock_refresh, df_pg_ok):
+    engine = MagicMock()
+    ctx = MagicMock()
+    conn = MagicMock()
+    ctx.__enter__.return_value = conn
+    engine.begin.return_value = ctx
+    mock_engine_mk.return_value = engine
+    assert save_postgres(df_pg_ok, schema="normalized") == len(df_pg_ok)
+    mock_ensure.assert_called_once_with(engine, schema="normalized")
+    mock_refresh.assert_called_once_with(engine)
+    assert mock_text.call_args_list[0].args[0] == "SET LOCAL TIME ZONE 'UTC'"
+    products = conn.execute.call_args_list[-2].args[1]
+    observations = conn.execute.call_args_list[-1].args[1]
+    assert sorted(p["title"] for p in products) == ["A", "B"]
+    assert set(observations[0]) == {"source", "title", "price", "rating", "ts"}
+    assert {p["source"] for p in products} == {"fashion-studio"}
+
+@patch("utils.load.refresh_latest_product")
+@patch("utils.load.ensure_products_table")
+@patch("utils.load.make_pg_engine")
+@patch("utils.load.text")
+def test_save_postgres_normalized_keeps_sources_apart(mock_text, mock_engine_mk, mock_ensure, mock_refresh):
+    df = pd.DataFrame({
+        "Title": ["T-shirt 2", "T-shirt 2"],
+        "Price": [1000.0, 5000.0],
+        "Rating": [4.0, 3.0],
+        "Colors": [2, 5],
+        "Size": ["M", "L"],
+        "Gender": ["Men", "Women"],
+        "Timestamp": pd.to_datetime(["2025-01-01", "2025-01-01"]),
+        "Source": ["fashion-studio", "other-shop"],
+    })
+    engine = MagicMock()
+    conn = MagicMock()
+    engine.begin.return_value.__enter__.return_value = conn
+    mock_engine_mk.return_value = engine
+    assert save_postgres(df, schema="normalized") == 2
+    products = conn.execute.call_args_list[-2].args[1]
+    observations = conn.execute.call_args_list[-1].args[1]
+    assert sorted((p["source"], p["title"], p["colors"]) for p in products) == [
+        ("fashion-studio", "T-shirt 2", 2), ("other-shop", "T-shirt 2", 5)
+    ]
+    assert sorted((o["source"], o["price"]) for o in observations) == [("fashion-studio", 1000.0), ("other-shop", 5000.0)]
+    upsert, observe = [str(c.args[0]) for c in mock_text.call_args_list[-2:]]
+    assert "ON CONFLICT (source, title)" in upsert
+    assert "WHERE source = :source AND title = :title" in observe
+    assert "CASE WHEN EXCLUDED.last_seen >= product.last_seen THEN EXCLUDED.colors ELSE product.colors END" in upsert
+
+@patch("utils.load.make_pg_engine")
+def test_save_postgres_unknown_schema_raises(mock_engine_mk, df_pg_ok):
+    mock_engine_mk.return_value = MagicMock()
+    with pytest.raises(ValueError):
+        save_postgres(df_pg_ok, schema="bogus")
+
+@patch("utils.load.text", side_effect=lambda s: s)
+def test_ensure_products_table_flat_has_source(mock_text):
+    engine = MagicMock()
+    conn = MagicMock()
+    engine.begin.return_value.__enter__.return_value = conn
+    ensure_products_table(engine)
+    ddl = " ".join(c.args[0] for c in conn.execute.call_args_list)
+    assert "ADD COLUMN IF NOT EXISTS source" in ddl
+    assert "DROP INDEX IF EXISTS ux_products_title_ts" in ddl
+    assert "products(source, title, ts)" in ddl
+
+@patch("utils.load.ensure_products_table")
+@patch("utils.load.make_pg_engine")
+@patch("utils.load.text", side_effect=lambda s: s)
+def test_save_postgres_flat_keeps_sources_apart(mock_text, mock_engine_mk, mock_ensure, df_pg_ok):
+    df = df_pg_ok.assign(Title="T-shirt 2", Timestamp=df_pg_ok["Timestamp"].iloc[0], Source=["a", "b"])
+    engine = MagicMock()
+    conn = MagicMock()
+    engine.begin.return_value.__enter__.return_value = conn
+    mock_engine_mk.return_value = engine
+    assert save_postgres(df) == 2
+    sql, rows = conn.execute.call_args.args
+    assert "ON CONFLICT (source, title, ts)" in sql
+    assert sorted(r["source"] for r in rows) == ["a", "b"]
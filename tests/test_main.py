@@ -0,0 +1,84 @@
+import subprocess
+import sys
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from main import build_parser, parse_dsn, main
+
+def test_parser_defaults(monkeypatch):
+    for k in ("ETL_SINKS", "ETL_SOURCES", "ETL_START_PAGE", "ETL_END_PAGE", "PG_DSN"):
+        monkeypatch.delenv(k, raising=False)
+    args = build_parser().parse_args([])
+    assert args.sinks == ["csv", "sheets", "postgres"]
+    assert (args.start, args.end) == (1, 50)
+    assert args.sources == ["fashion-studio"]
+
+def test_parser_env_overrides(monkeypatch):
+    monkeypatch.setenv("ETL_SINKS", "csv")
+    monkeypatch.setenv("ETL_END_PAGE", "3")
+    args = build_parser().parse_args([])
+    assert args.sinks == ["csv"]
+    assert args.end == 3
+    assert build_parser().parse_args(["--sinks", "csv,postgres"]).sinks == ["csv", "postgres"]
+
+def test_parser_rejects_unknown_sink():
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["--sinks", "csv,parquet"])
+
+def test_parse_dsn():
+    assert parse_dsn("postgresql://u:p%40ss@db:6543/shop") == {
+        "host": "db", "port": 6543, "db": "shop", "user": "u", "password": "p@ss"
+    }
+
+@patch("utils.load.save_postgres")
+@patch("utils.load.save_google_sheets")
+@patch("utils.load.save_csv", return_value="out.csv")
+@patch("utils.transform.transform_data", return_value=pd.DataFrame())
+@patch("utils.extract.scrape_sources", return_value=[])
+def test_main_csv_only(mock_scrape, mock_transform, mock_csv, mock_gs, mock_pg):
+    from utils.extract import FASHION_STUDIO
+    main(["--sinks", "csv", "--start", "2", "--end", "4", "--csv-path", "out.csv"])
+    mock_scrape.assert_called_once_with([FASHION_STUDIO], 2, 4, concurrency=1, min_interval=0.3)
+    mock_csv.assert_called_once_with(mock_transform.return_value, "out.csv")
+    mock_gs.assert_not_called()
+    mock_pg.assert_not_called()
+
+def test_csv_run_does_not_import_backends():
+    code = (
+        "import sys, main\n"
+        "import utils.load\n"
+        "assert 'gspread' not in sys.modules\n"
+        "assert 'sqlalchemy' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+@patch("utils.load.save_postgres", return_value=0)
+@patch("utils.transform.transform_data", return_value=pd.DataFrame())
+@patch("utils.extract.scrape_sources", return_value=[])
+def test_main_postgres_schema(mock_scrape, mock_transform, mock_pg):
+    main(["--sinks", "postgres", "--pg-schema", "normalized", "--dsn", "postgresql://u:p@h:1/d"])
+    mock_pg.assert_called_once_with(
+        mock_transform.return_value, schema="normalized", host="h", port=1, db="d", user="u", password="p"
+    )
+
+def test_main_unknown_source():
+    with pytest.raises(SystemExit):
+        main(["--sources", "nope", "--sinks", "csv"])
+
+@patch("utils.load.create_engine")
+def test_dsn_round_trips_to_engine_url(mock_ce):
+    from sqlalchemy.engine import make_url
+    from utils.load import make_pg_engine
+    make_pg_engine(**parse_dsn("postgresql://u%3Ax:p%40ss%2Fw%20rd@db:6543/shop"))
+    url = make_url(mock_ce.call_args.args[0])
+    assert (url.username, url.password, url.host, url.port, url.database) == ("u:x", "p@ss/w rd", "db", 6543, "shop")
+
+def test_parser_pg_schema(monkeypatch):
+    monkeypatch.setenv("PG_SCHEMA", "Normalized")
+    assert build_parser().parse_args([]).pg_schema == "normalized"
+    monkeypatch.setenv("PG_SCHEMA", "bogus")
+    with pytest.raises(SystemExit):
+        build_parser().parse_args([])
+    monkeypatch.delenv("PG_SCHEMA")
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["--pg-schema", "normalised"])
@@ -0,0 +1,48 @@
+import pytest
+import pandas as pd
+from unittest.mock import patch, MagicMock
+from utils.query import get_latest, get_latest_price, get_price_history, get_latest_products
+
+def make_engine(rows):
+    engine = MagicMock()
+    conn = MagicMock()
+    engine.connect.return_value.__enter__.return_value = conn
+    conn.execute.return_value.mappings.return_value.all.return_value = rows
+    return engine, conn
+
+def test_get_latest_found():
+    row = {"product_id":1,"source":"fashion-studio","title":"A","price":1000.0,"rating":4.0,"colors":2,"size":"M","gender":"Men","ts":"t"}
+    engine, conn = make_engine([row])
+    assert get_latest(engine, "A") == row
+    assert conn.execute.call_args.args[1] == {"source": "fashion-studio", "title": "A"}
+
+def test_get_latest_price_missing():
+    engine, _ = make_engine([])
+    assert get_latest_price(engine, "nope") is None
+
+def test_get_latest_none_engine():
+    with pytest.raises(RuntimeError):
+        get_latest(None, "A")
+
+@patch("utils.query.text", side_effect=lambda s: s)
+def test_get_price_history_filters(mock_text):
+    rows = [{"ts":"2025-01-02","price":2.0,"rating":4.0},{"ts":"2025-01-01","price":1.0,"rating":4.0}]
+    engine, conn = make_engine(rows)
+    df = get_price_history(engine, "A", source="other-shop", since="2025-01-01", limit=10)
+    assert list(df.columns) == ["ts","price","rating"]
+    assert len(df) == 2
+    sql, params = conn.execute.call_args.args
+    assert "ORDER BY o.ts DESC" in sql and "LIMIT :limit" in sql
+    assert params["limit"] == 10
+    assert params["source"] == "other-shop"
+    assert params["since"] == pd.Timestamp("2025-01-01")
+
+@patch("utils.query.text", side_effect=lambda s: s)
+def test_get_latest_products_empty(mock_text):
+    engine, conn = make_engine([])
+    df = get_latest_products(engine, gender="Women", max_price=50000)
+    assert df.empty
+    assert "title" in df.columns
+    sql, params = conn.execute.call_args.args
+    assert "gender = :gender" in sql and "price <= :max_price" in sql
+    assert params == {"limit": 100, "gender": "Women", "max_price": 50000}
@@ -63,3 +63,8 @@ def test_transform_data_global_exception_path():
         out = transform_data([{"Title":"A"}])
         assert list(out.columns) == ["Title","Price","Rating","Colors","Size","Gender","Timestamp"]
         assert out.empty
+
+def test_transform_keeps_source_per_site():
+    row = {"Title":"T-shirt 2","Price":"$2.50","Rating":"3.5 / 5","Colors":"2 Colors","Size":"Size: L","Gender":"Gender: M","Timestamp":"2025-10-22T00:00:00"}
+    df = transform_data([dict(row, Source="a"), dict(row, Source="b")])
+    assert list(df["Source"]) == ["a", "b"]
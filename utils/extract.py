@@ -1,8 +1,16 @@
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import logging
+import queue
+import threading
 import time
 
+logger = logging.getLogger(__name__)
+
 def extract_product_data(card, timestamp):
     try:
         t = card.find("h3", class_="product-title")
@@ -32,24 +40,167 @@ def extract_product_data(card, timestamp):
             "Colors":"0 Colors","Size":"Size: Unknown","Gender":"Gender: Unknown","Timestamp": timestamp
         }
 
-def scrape_page(session, page_num):
+# A catalogue site plugin supplies the page URLs and the card parser.
+# `concurrency` and `min_interval` override the scheduler defaults for the
+# site's host when set.
+class Source(ABC):
+    name = ""
+    base_url = ""
+    concurrency = None
+    min_interval = None
+
+    @property
+    def host(self):
+        return urlsplit(self.base_url).netloc
+
+    @abstractmethod
+    def page_url(self, page_num):
+        ...
+
+    def page_urls(self, start, end):
+        return [self.page_url(i) for i in range(start, end+1)]
+
+    @abstractmethod
+    def find_cards(self, soup):
+        ...
+
+    @abstractmethod
+    def parse_card(self, card, timestamp):
+        ...
+
+class FashionStudioSource(Source):
+    name = "fashion-studio"
+    base_url = "https://fashion-studio.dicoding.dev/"
+
+    def page_url(self, page_num):
+        return self.base_url if page_num == 1 else f"{self.base_url}page{page_num}"
+
+    def find_cards(self, soup):
+        return soup.find_all("div", class_="collection-card")
+
+    def parse_card(self, card, timestamp):
+        return extract_product_data(card, timestamp)
+
+SOURCES = {}
+
+def register_source(source):
+    SOURCES[source.name] = source
+    return source
+
+FASHION_STUDIO = register_source(FashionStudioSource())
+
+def get_sources(names):
+    try:
+        return [SOURCES[n] for n in names]
+    except KeyError as e:
+        raise ValueError(f"Unknown source: {e.args[0]!r} (available: {', '.join(sorted(SOURCES))})") from None
+
+def fetch_page(session, url, source):
     try:
-        url = "https://fashion-studio.dicoding.dev/" if page_num == 1 else f"https://fashion-studio.dicoding.dev/page{page_num}"
         resp = session.get(url, timeout=10)
         resp.raise_for_status()
         soup = BeautifulSoup(resp.content, "html.parser")
-        cards = soup.find_all("div", class_="collection-card")
+        cards = source.find_cards(soup)
         ts = datetime.now().isoformat()
-        return [extract_product_data(c, ts) for c in cards]
-    except requests.exceptions.RequestException:
+        return [{**source.parse_card(c, ts), "Source": source.name} for c in cards]
+    except requests.exceptions.RequestException as e:
+        logger.warning("Skipping page %s of source %r: %s", url, source.name, e)
+        return []
+    except Exception:
+        logger.exception("Skipping page %s of source %r: parse failed", url, source.name)
         return []
+
+def scrape_page(session, page_num):
+    return fetch_page(session, FASHION_STUDIO.page_url(page_num), FASHION_STUDIO)
+
+def new_session():
+    session = requests.Session()
+    session.headers.update({"User-Agent":"Mozilla/5.0"})
+    return session
+
+# Keeps at least `min_interval` seconds between request starts to one host,
+# and between a response arriving and the next request being sent.
+class HostLimiter:
+    def __init__(self, min_interval=0.3):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next - now)
+            self._next = max(now, self._next) + self.min_interval
+        if delay:
+            time.sleep(delay)
+
+    def done(self):
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + self.min_interval)
+
+# Each host gets its own job queue, rate limiter and `concurrency` workers,
+# and all hosts are worked in parallel, so a run takes about as long as the
+# slowest site. Results keep source order, then page order. A source whose
+# URLs cannot be built, or a page that fails, is logged and skipped.
+def scrape_sources(sources, start=1, end=50, concurrency=1, min_interval=0.3):
+    try:
+        hosts = {}
+        for si, src in enumerate(sources):
+            try:
+                urls = list(src.page_urls(start, end))
+                host = src.host
+            except Exception:
+                logger.exception("Skipping source %r: cannot build page URLs", getattr(src, "name", src))
+                continue
+            h = hosts.setdefault(host, {"jobs": queue.Queue(), "n": 0, "concurrency": concurrency, "min_interval": min_interval})
+            if src.concurrency is not None:
+                h["concurrency"] = src.concurrency
+            if src.min_interval is not None:
+                h["min_interval"] = src.min_interval
+            for pi, url in enumerate(urls):
+                h["jobs"].put(((si, pi), src, url))
+                h["n"] += 1
+
+        results = {}
+
+        def worker(jobs, limiter):
+            try:
+                session = new_session()
+            except Exception:
+                logger.exception("Worker could not open a session")
+                return
+            try:
+                while True:
+                    try:
+                        key, src, url = jobs.get_nowait()
+                    except queue.Empty:
+                        return
+                    limiter.wait()
+                    try:
+                        results[key] = fetch_page(session, url, src)
+                    except Exception:
+                        logger.exception("Skipping page %s of source %r", url, src.name)
+                    finally:
+                        limiter.done()
+            finally:
+                session.close()
+
+        workers = []
+        for h in hosts.values():
+            limiter = HostLimiter(h["min_interval"])
+            workers += [(h["jobs"], limiter)] * max(1, min(h["concurrency"], h["n"]))
+        if not workers:
+            return []
+        with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+            for f in [pool.submit(worker, jobs, limiter) for jobs, limiter in workers]:
+                f.result()
+        return [p for key in sorted(results) for p in results[key]]
     except Exception:
         return []
 
 def scrape_all_pages(start=1, end=50):
     try:
-        session = requests.Session()
-        session.headers.update({"User-Agent":"Mozilla/5.0"})
+        session = new_session()
         all_products = []
         for i in range(start, end+1):
             try:
@@ -1,8 +1,33 @@
+import importlib
+from urllib.parse import quote
+from dateutil import tz
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import OperationalError, ProgrammingError, SQLAlchemyError
+
+# gspread, google-auth and SQLAlchemy are heavy to import, so they are only
+# resolved when a sink that needs them is used (or a test patches them).
+_LAZY = {
+    "gspread": ("gspread", None),
+    "Credentials": ("google.oauth2.service_account", "Credentials"),
+    "create_engine": ("sqlalchemy", "create_engine"),
+    "text": ("sqlalchemy", "text"),
+    "OperationalError": ("sqlalchemy.exc", "OperationalError"),
+    "ProgrammingError": ("sqlalchemy.exc", "ProgrammingError"),
+    "SQLAlchemyError": ("sqlalchemy.exc", "SQLAlchemyError"),
+}
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attr = _LAZY[name]
+    obj = importlib.import_module(module)
+    if attr:
+        obj = getattr(obj, attr)
+    globals()[name] = obj
+    return obj
+
+def _lazy(*names):
+    g = globals()
+    return [g[n] if n in g else __getattr__(n) for n in names]
 
 def save_csv(df, path="products.csv"):
     try:
@@ -12,6 +37,7 @@ def save_csv(df, path="products.csv"):
         return False
 
 def save_google_sheets(df, name, creds_json):
+    gspread, Credentials = _lazy("gspread", "Credentials")
     try:
         scopes = ["https://www.googleapis.com/auth/spreadsheets","https://www.googleapis.com/auth/drive"]
         creds = Credentials.from_service_account_file(creds_json, scopes=scopes)
@@ -36,8 +62,11 @@ def save_google_sheets(df, name, creds_json):
     return sh.url
 
 def make_pg_engine(host="localhost", port=5432, db="fashion", user="developer", password="supersecretpassword"):
+    create_engine, text, OperationalError, SQLAlchemyError = _lazy(
+        "create_engine", "text", "OperationalError", "SQLAlchemyError"
+    )
     try:
-        url = f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db}"
+        url = f"postgresql+psycopg2://{quote(user, safe='')}:{quote(password, safe='')}@{host}:{port}/{db}"
         engine = create_engine(url, pool_pre_ping=True)
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
@@ -49,9 +78,64 @@ def make_pg_engine(host="localhost", port=5432, db="fashion", user="developer",
     except Exception:
         return None
 
-def ensure_products_table(engine):
+PRICE_HISTORY_DDL = """
+CREATE TABLE IF NOT EXISTS product (
+    product_id BIGSERIAL PRIMARY KEY,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    colors INTEGER,
+    size TEXT,
+    gender TEXT,
+    first_seen TIMESTAMPTZ NOT NULL,
+    last_seen TIMESTAMPTZ NOT NULL,
+    UNIQUE (source, title)
+);
+CREATE TABLE IF NOT EXISTS price_observation (
+    product_id BIGINT NOT NULL REFERENCES product(product_id),
+    ts TIMESTAMPTZ NOT NULL,
+    price NUMERIC NOT NULL,
+    rating NUMERIC,
+    PRIMARY KEY (product_id, ts)
+) PARTITION BY RANGE (ts);
+CREATE MATERIALIZED VIEW IF NOT EXISTS latest_product AS
+    SELECT p.product_id, p.source, p.title, o.price, o.rating, p.colors, p.size, p.gender, o.ts
+    FROM product p
+    CROSS JOIN LATERAL (
+        SELECT price, rating, ts FROM price_observation o
+        WHERE o.product_id = p.product_id
+        ORDER BY o.ts DESC
+        LIMIT 1
+    ) o;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_latest_product_id ON latest_product(product_id);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_latest_product_source_title ON latest_product(source, title);
+CREATE INDEX IF NOT EXISTS ix_latest_product_gender_price ON latest_product(gender, price)
+"""
+
+def _run_ddl(engine, ddl):
+    text, ProgrammingError, SQLAlchemyError = _lazy("text", "ProgrammingError", "SQLAlchemyError")
+    try:
+        with engine.begin() as conn:
+            for stmt in ddl.strip().split(";"):
+                s = stmt.strip()
+                if s:
+                    conn.execute(text(s))
+    except ProgrammingError:
+        raise
+    except SQLAlchemyError:
+        raise
+    except Exception:
+        raise
+
+def ensure_products_table(engine, schema="flat"):
     if engine is None:
         raise RuntimeError("Engine is None")
+    if schema == "normalized":
+        _run_ddl(engine, PRICE_HISTORY_DDL)
+        return
+    if schema != "flat":
+        raise ValueError(f"Unknown schema: {schema!r} (expected 'flat' or 'normalized')")
+    # The ALTER/DROP steps upgrade tables created before records carried a
+    # Source; rows are keyed by (source, title, ts) so sites never collide.
     ddl = """
     CREATE TABLE IF NOT EXISTS products (
         id SERIAL PRIMARY KEY,
@@ -63,33 +147,90 @@ def ensure_products_table(engine):
         gender TEXT,
         ts TIMESTAMPTZ NOT NULL
     );
-    CREATE UNIQUE INDEX IF NOT EXISTS ux_products_title_ts ON products(title, ts);
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS source TEXT NOT NULL DEFAULT 'fashion-studio';
+    DROP INDEX IF EXISTS ux_products_title_ts;
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_products_source_title_ts ON products(source, title, ts);
     """
-    try:
-        with engine.begin() as conn:
-            for stmt in ddl.strip().split(";"):
-                s = stmt.strip()
-                if s:
-                    conn.execute(text(s))
-    except ProgrammingError:
-        raise
-    except SQLAlchemyError:
-        raise
-    except Exception:
-        raise
+    _run_ddl(engine, ddl)
+
+# The extractor stamps records with naive local time (datetime.now()), so
+# naive values are localized to this host's zone before converting to UTC.
+# Partitions are cut on UTC month boundaries, so the bucket picked here is
+# the one Postgres routes the row to.
+def _to_utc(timestamps):
+    ts = pd.to_datetime(pd.Series(timestamps), errors="coerce")
+    if ts.dt.tz is None:
+        ts = ts.dt.tz_localize(tz.tzlocal(), ambiguous="NaT", nonexistent="shift_forward")
+    return ts.dt.tz_convert("UTC")
+
+def ensure_month_partitions(conn, timestamps):
+    text, = _lazy("text")
+    months = sorted({(t.year, t.month) for t in _to_utc(timestamps).dropna()})
+    for y, m in months:
+        ny, nm = (y + 1, 1) if m == 12 else (y, m + 1)
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS price_observation_y{y:04d}m{m:02d} PARTITION OF price_observation "
+            f"FOR VALUES FROM ('{y:04d}-{m:02d}-01 00:00:00+00') TO ('{ny:04d}-{nm:02d}-01 00:00:00+00')"
+        ))
+    return len(months)
+
+def refresh_latest_product(engine):
+    text, = _lazy("text")
+    with engine.begin() as conn:
+        conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY latest_product"))
+
+def _save_price_history(engine, out):
+    text, = _lazy("text")
+    out = out.assign(ts=_to_utc(out["ts"]))
+    products = (
+        out.sort_values("ts")
+        .groupby(["source","title"], as_index=False)
+        .agg(colors=("colors", "last"), size=("size", "last"), gender=("gender", "last"),
+             first_seen=("ts", "min"), last_seen=("ts", "max"))
+    )
+    upsert = """
+    INSERT INTO product (source, title, colors, size, gender, first_seen, last_seen)
+    VALUES (:source, :title, :colors, :size, :gender, :first_seen, :last_seen)
+    ON CONFLICT (source, title) DO UPDATE SET
+        colors = CASE WHEN EXCLUDED.last_seen >= product.last_seen THEN EXCLUDED.colors ELSE product.colors END,
+        size = CASE WHEN EXCLUDED.last_seen >= product.last_seen THEN EXCLUDED.size ELSE product.size END,
+        gender = CASE WHEN EXCLUDED.last_seen >= product.last_seen THEN EXCLUDED.gender ELSE product.gender END,
+        first_seen = LEAST(product.first_seen, EXCLUDED.first_seen),
+        last_seen = GREATEST(product.last_seen, EXCLUDED.last_seen);
+    """
+    observe = """
+    INSERT INTO price_observation (product_id, ts, price, rating)
+    SELECT product_id, :ts, :price, :rating FROM product WHERE source = :source AND title = :title
+    ON CONFLICT (product_id, ts) DO NOTHING;
+    """
+    rows = out[["source","title","price","rating","ts"]].to_dict(orient="records")
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+        ensure_month_partitions(conn, out["ts"])
+        conn.execute(text(upsert), products.to_dict(orient="records"))
+        conn.execute(text(observe), rows)
+    refresh_latest_product(engine)
+    return len(rows)
 
-def save_postgres(df: pd.DataFrame, host="localhost", port=5432, db="fashion", user="developer", password="supersecretpassword") -> int:
+def save_postgres(df: pd.DataFrame, host="localhost", port=5432, db="fashion", user="developer", password="supersecretpassword", schema="flat") -> int:
+    text, OperationalError, SQLAlchemyError = _lazy("text", "OperationalError", "SQLAlchemyError")
     try:
         if df is None or df.empty:
             return 0
         engine = make_pg_engine(host, port, db, user, password)
         if engine is None:
             return 0
-        ensure_products_table(engine)
+        ensure_products_table(engine, schema=schema)
 
         out = df.rename(columns={
-            "Title":"title","Price":"price","Rating":"rating","Colors":"colors","Size":"size","Gender":"gender","Timestamp":"ts"
-        })[["title","price","rating","colors","size","gender","ts"]].copy()
+            "Title":"title","Price":"price","Rating":"rating","Colors":"colors","Size":"size","Gender":"gender","Timestamp":"ts",
+            "Source":"source"
+        })
+        if "source" not in out.columns:
+            # Records without a Source predate the source plugins and all
+            # came from fashion-studio.
+            out["source"] = "fashion-studio"
+        out = out[["source","title","price","rating","colors","size","gender","ts"]].copy()
 
         if out["price"].dtype == object:
             out["price"] = (
@@ -104,12 +245,14 @@ def save_postgres(df: pd.DataFrame, host="localhost", port=5432, db="fashion", u
         out = out.dropna(subset=["price","ts","title"])
         if out.empty:
             return 0
+        if schema == "normalized":
+            return _save_price_history(engine, out)
 
         rows = out.to_dict(orient="records")
         sql = """
-        INSERT INTO products (title, price, rating, colors, size, gender, ts)
-        VALUES (:title, :price, :rating, :colors, :size, :gender, :ts)
-        ON CONFLICT (title, ts) DO NOTHING;
+        INSERT INTO products (source, title, price, rating, colors, size, gender, ts)
+        VALUES (:source, :title, :price, :rating, :colors, :size, :gender, :ts)
+        ON CONFLICT (source, title, ts) DO NOTHING;
         """
         with engine.begin() as conn:
             conn.execute(text(sql), rows)
@@ -0,0 +1,66 @@
+# Lookups over the normalized price-history schema (see ensure_products_table).
+# Products are identified by (source, title); `source` defaults to the
+# original fashion-studio site.
+# Each query is served by an index (latest_product on title/gender, or the
+# price_observation primary key (product_id, ts), scanned backwards), so its
+# cost follows the number of products or rows returned rather than the amount
+# of stored history.
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+DEFAULT_SOURCE = "fashion-studio"
+LATEST_COLUMNS = ["product_id","source","title","price","rating","colors","size","gender","ts"]
+HISTORY_COLUMNS = ["ts","price","rating"]
+
+def _fetch(engine, sql, params):
+    if engine is None:
+        raise RuntimeError("Engine is None")
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text(sql), params).mappings().all()
+    except SQLAlchemyError:
+        raise
+
+def get_latest(engine, title, source=DEFAULT_SOURCE):
+    rows = _fetch(engine, """
+        SELECT product_id, source, title, price, rating, colors, size, gender, ts
+        FROM latest_product WHERE source = :source AND title = :title
+    """, {"source": source, "title": title})
+    return dict(rows[0]) if rows else None
+
+def get_latest_price(engine, title, source=DEFAULT_SOURCE):
+    row = get_latest(engine, title, source)
+    return None if row is None else row["price"]
+
+def get_price_history(engine, title, source=DEFAULT_SOURCE, since=None, limit=None):
+    sql = """
+        SELECT o.ts, o.price, o.rating
+        FROM product p
+        JOIN price_observation o ON o.product_id = p.product_id
+        WHERE p.source = :source AND p.title = :title
+    """
+    params = {"source": source, "title": title}
+    if since is not None:
+        sql += " AND o.ts >= :since"
+        params["since"] = pd.to_datetime(since)
+    sql += " ORDER BY o.ts DESC"
+    if limit is not None:
+        sql += " LIMIT :limit"
+        params["limit"] = int(limit)
+    return pd.DataFrame(_fetch(engine, sql, params), columns=HISTORY_COLUMNS)
+
+def get_latest_products(engine, source=None, gender=None, max_price=None, limit=100):
+    sql = "SELECT product_id, source, title, price, rating, colors, size, gender, ts FROM latest_product WHERE TRUE"
+    params = {"limit": int(limit)}
+    if source is not None:
+        sql += " AND source = :source"
+        params["source"] = source
+    if gender is not None:
+        sql += " AND gender = :gender"
+        params["gender"] = gender
+    if max_price is not None:
+        sql += " AND price <= :max_price"
+        params["max_price"] = max_price
+    sql += " ORDER BY price LIMIT :limit"
+    return pd.DataFrame(_fetch(engine, sql, params), columns=LATEST_COLUMNS)
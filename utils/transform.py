@@ -1,6 +1,3 @@
-import pandas as pd
-import numpy as np 
-
 import pandas as pd
 import numpy as np
 
@@ -49,6 +46,8 @@ def transform_data(raw):
         df["Colors"] = clean_colors(df["Colors"])
         df["Size"]   = clean_size(df["Size"])
         df["Gender"] = clean_gender(df["Gender"])
+        if "Source" in df.columns:
+            df["Source"] = df["Source"].astype(str).str.strip()
         df = df[df["Title"] != "Unknown Product"]
         df = df.dropna()
         df = df.drop_duplicates().reset_index(drop=True)